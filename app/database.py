@@ -1,4 +1,9 @@
 import os
+import threading
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+
 import psycopg2
 
 # Database configuration
@@ -21,26 +26,168 @@ else:
     DB_CONFIG["host"] = os.environ.get("DB_HOST", "localhost")
     DB_CONFIG["port"] = os.environ.get("DB_PORT", "5432")
 
+# Maximum connections held open by each worker process.
+# The gunicorn config sets this per serving profile (see serving.py).
+DB_POOL_SIZE = int(os.environ.get("DB_POOL_SIZE", "8"))
+
+# Seconds a request waits for a free pooled connection before giving up
+DB_POOL_TIMEOUT = float(os.environ.get("DB_POOL_TIMEOUT", "10"))
+
+# Seconds a connection may sit idle before it is checked on checkout
+DB_POOL_IDLE_CHECK = float(os.environ.get("DB_POOL_IDLE_CHECK", "30"))
+
 
 def get_db_connection() -> psycopg2.extensions.connection:
     """Create and return a database connection"""
     return psycopg2.connect(**DB_CONFIG)
 
 
+def _is_alive(conn: psycopg2.extensions.connection) -> bool:
+    """
+    Check that an idle connection still reaches the server.
+
+    conn.closed only reflects closes made by this client, not sessions dropped
+    by Cloud SQL, its proxy or a database restart. A dead connection is closed.
+    The ping runs in autocommit so it costs one round trip, not BEGIN/ROLLBACK.
+    """
+    try:
+        conn.autocommit = True
+        try:
+            with conn.cursor() as cur:
+                cur.execute("SELECT 1")
+        finally:
+            conn.autocommit = False
+    except (psycopg2.OperationalError, psycopg2.InterfaceError):
+        conn.close()
+        return False
+    return True
+
+
+class ConnectionPool:
+    """
+    Bounded pool of connections owned by a single process.
+
+    Connections are opened lazily, so a pool created in the gunicorn master
+    (e.g. with --preload) holds nothing that could leak into forked workers.
+    """
+
+    def __init__(
+        self,
+        size: int,
+        timeout: float = DB_POOL_TIMEOUT,
+        idle_check: float = DB_POOL_IDLE_CHECK,
+    ) -> None:
+        self.size = size
+        self.timeout = timeout
+        self.idle_check = idle_check
+        self.pid = os.getpid()
+        self._slots = threading.BoundedSemaphore(size)
+        self._lock = threading.Lock()
+        # Idle connections with the monotonic time they were returned
+        self._idle: list[tuple[psycopg2.extensions.connection, float]] = []
+
+    @contextmanager
+    def connection(self) -> Iterator[psycopg2.extensions.connection]:
+        """Borrow a connection, returning it to the pool when done"""
+        if not self._slots.acquire(timeout=self.timeout):
+            raise TimeoutError(
+                f"No database connection available within {self.timeout}s"
+            )
+        try:
+            conn = self._checkout()
+            try:
+                yield conn
+            except Exception:
+                # Connection state is unknown after a failure, so don't reuse it
+                conn.close()
+                raise
+            if conn.closed:
+                return
+            with self._lock:
+                self._idle.append((conn, time.monotonic()))
+        finally:
+            self._slots.release()
+
+    def _checkout(self) -> psycopg2.extensions.connection:
+        """Return a live idle connection, or open a new one"""
+        while True:
+            with self._lock:
+                if not self._idle:
+                    break
+                conn, returned_at = self._idle.pop()
+            # Recently used connections are trusted; only stale ones are pinged
+            if time.monotonic() - returned_at < self.idle_check or _is_alive(conn):
+                return conn
+        return get_db_connection()
+
+    def close(self) -> None:
+        """Close all idle connections"""
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for conn, _ in idle:
+            conn.close()
+
+
+_pool: ConnectionPool | None = None
+_pool_lock = threading.Lock()
+
+# Size for new pools; set per serving profile by reset_pool()
+_pool_size = DB_POOL_SIZE
+
+# Pools inherited from a parent process. Kept referenced so garbage collection
+# never closes them: closing would terminate the parent's session on the
+# shared socket.
+_inherited_pools: list[ConnectionPool] = []
+
+
+def get_pool() -> ConnectionPool:
+    """Return this process's connection pool, creating it on first use"""
+    global _pool
+    with _pool_lock:
+        # A pool inherited across fork belongs to the parent - never reuse it
+        if _pool is not None and _pool.pid != os.getpid():
+            _inherited_pools.append(_pool)
+            _pool = None
+        if _pool is None:
+            _pool = ConnectionPool(_pool_size)
+        return _pool
+
+
+def reset_pool(size: int | None = None) -> None:
+    """
+    Discard the current pool so the next request builds a fresh one.
+
+    Called from the gunicorn post_worker_init hook so every worker starts with
+    its own empty pool. That hook runs after the gevent worker has
+    monkey-patched, so the new pool's locks are green.
+    """
+    global _pool, _pool_size
+    with _pool_lock:
+        if _pool is not None:
+            if _pool.pid == os.getpid():
+                _pool.close()
+            else:
+                _inherited_pools.append(_pool)
+        _pool = None
+        if size is not None:
+            _pool_size = size
+
+
 def insert_user(
     first_name: str, last_name: str, email: str, favourite_colour: str
 ) -> int:
     """Insert a user and return the new user id."""
-    with get_db_connection() as conn:
-        with conn.cursor() as cur:
-            cur.execute(
-                """
-                INSERT INTO users (first_name, last_name, email, favourite_colour)
-                VALUES (%s, %s, %s, %s)
-                RETURNING id
-                """,
-                (first_name, last_name, email, favourite_colour),
-            )
-            user_id = cur.fetchone()[0]
-            conn.commit()
-            return user_id
+    with get_pool().connection() as conn:
+        with conn:
+            with conn.cursor() as cur:
+                cur.execute(
+                    """
+                    INSERT INTO users (first_name, last_name, email, favourite_colour)
+                    VALUES (%s, %s, %s, %s)
+                    RETURNING id
+                    """,
+                    (first_name, last_name, email, favourite_colour),
+                )
+                user_id = cur.fetchone()[0]
+                conn.commit()
+                return user_id
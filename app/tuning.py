@@ -0,0 +1,327 @@
+"""
+Sweep gunicorn workers x threads against the local database and recommend
+serving settings that fit within a Cloud SQL connection limit.
+
+Usage:
+    uv run python -m app.tuning --cloud-sql-max-connections 25 --max-instances 5
+
+Requires the local database (make local-db-up). Benchmark submissions are
+inserted into its users table.
+"""
+
+import argparse
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.parse
+import urllib.request
+from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from http.cookiejar import CookieJar
+
+from pydantic import BaseModel
+
+BENCHMARK_FORM = {
+    "first_name": "Bench",
+    "last_name": "Mark",
+    "email": "bench@example.com",
+    "favourite_colour": "blue",
+}
+
+
+class BenchmarkResult(BaseModel):
+    workers: int
+    threads: int
+    connections: int
+    requests: int
+    errors: int
+    throughput: float  # successful requests per second
+    p50_ms: float
+    p95_ms: float
+
+
+def connection_budget(
+    cloud_sql_max_connections: int, max_instances: int, reserved: int
+) -> int:
+    """Connections each Cloud Run instance may open without exceeding the limit"""
+    return max(0, (cloud_sql_max_connections - reserved) // max_instances)
+
+
+def candidate_settings(
+    workers_options: list[int], threads_options: list[int], budget: int
+) -> list[tuple[int, int]]:
+    """All workers x threads pairs whose pools fit within the per-instance budget"""
+    return [
+        (workers, threads)
+        for workers in workers_options
+        for threads in threads_options
+        if workers * threads <= budget
+    ]
+
+
+def recommend(results: list[BenchmarkResult]) -> BenchmarkResult | None:
+    """Pick the error-free result with the best throughput, then fewest connections"""
+    clean = [r for r in results if r.errors == 0]
+    if not clean:
+        return None
+    return max(clean, key=lambda r: (r.throughput, -r.connections))
+
+
+def split_cpus(available: list[int], cpus: int) -> tuple[set[int], set[int]]:
+    """
+    Split CPUs between the server under test and the load generator.
+
+    The server gets the first `cpus` CPUs, matching the Cloud Run instance.
+    The client gets the rest, or shares the server's when none are left.
+    """
+    server_cpus = set(available[:cpus])
+    client_cpus = set(available[cpus:]) or server_cpus
+    return server_cpus, client_cpus
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+# Lines of gunicorn output shown when a setting fails to start
+LOG_TAIL_LINES = 20
+
+
+def _wait_until_ready(url: str, server: subprocess.Popen, timeout: float = 15) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if server.poll() is not None:
+            raise RuntimeError(f"gunicorn exited with code {server.returncode}")
+        try:
+            urllib.request.urlopen(url, timeout=1).close()
+            return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError(f"Server at {url} did not start within {timeout}s")
+
+
+def _submit(url: str) -> tuple[bool, float]:
+    """Post the form once, following the redirect to see whether it saved"""
+    opener = urllib.request.build_opener(
+        urllib.request.HTTPCookieProcessor(CookieJar())
+    )
+    data = urllib.parse.urlencode(BENCHMARK_FORM).encode()
+    start = time.perf_counter()
+    try:
+        with opener.open(f"{url}/submit", data=data, timeout=30) as response:
+            ok = b'class="success"' in response.read()
+    except OSError:
+        ok = False
+    return ok, time.perf_counter() - start
+
+
+def run_benchmark(
+    url: str, requests: int, concurrency: int
+) -> tuple[int, float, list[float]]:
+    """Fire requests at the server and return (errors, elapsed seconds, latencies)"""
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        outcomes = list(pool.map(lambda _: _submit(url), range(requests)))
+    elapsed = time.perf_counter() - start
+    errors = sum(1 for ok, _ in outcomes if not ok)
+    latencies = [latency for ok, latency in outcomes if ok]
+    return errors, elapsed, latencies
+
+
+@contextmanager
+def _cpu_affinity(cpus: set[int] | None) -> Iterator[None]:
+    """Temporarily pin this thread, so processes it starts inherit the CPUs"""
+    if not cpus:
+        yield
+        return
+    previous = os.sched_getaffinity(0)
+    os.sched_setaffinity(0, cpus)
+    try:
+        yield
+    finally:
+        os.sched_setaffinity(0, previous)
+
+
+def benchmark_setting(
+    workers: int,
+    threads: int,
+    requests: int,
+    concurrency: int,
+    server_cpus: set[int] | None = None,
+) -> BenchmarkResult:
+    """
+    Start gunicorn with the given setting and benchmark it.
+
+    When server_cpus is given, gunicorn is pinned to those CPUs. Raises
+    RuntimeError, including the tail of gunicorn's output, if the server
+    fails to start.
+    """
+    port = _free_port()
+    env = {
+        **os.environ,
+        "SERVE_PROFILE": "gthread",
+        "WEB_CONCURRENCY": str(workers),
+        "GUNICORN_THREADS": str(threads),
+        "DB_POOL_SIZE": str(threads),
+        # Replace any exported per-instance cap that would reject this setting
+        "DB_MAX_CONNECTIONS": str(workers * threads),
+        "PORT": str(port),
+    }
+    with tempfile.TemporaryFile() as log:
+        with _cpu_affinity(server_cpus):
+            server = subprocess.Popen(
+                ["gunicorn", "--config", "gunicorn.conf.py", "app:create_app()"],
+                env=env,
+                stdout=log,
+                stderr=subprocess.STDOUT,
+            )
+        try:
+            url = f"http://127.0.0.1:{port}"
+            try:
+                _wait_until_ready(url, server)
+            except RuntimeError as e:
+                log.seek(0)
+                output = log.read().decode(errors="replace").strip().splitlines()
+                tail = "\n".join(output[-LOG_TAIL_LINES:])
+                raise RuntimeError(f"{e}\n{tail}") from None
+            errors, elapsed, latencies = run_benchmark(url, requests, concurrency)
+        finally:
+            server.terminate()
+            server.wait()
+
+    if len(latencies) >= 2:
+        cut_points = statistics.quantiles(latencies, n=20)
+        p50, p95 = statistics.median(latencies), cut_points[18]
+    else:
+        p50 = p95 = latencies[0] if latencies else 0.0
+    return BenchmarkResult(
+        workers=workers,
+        threads=threads,
+        connections=workers * threads,
+        requests=requests,
+        errors=errors,
+        throughput=(requests - errors) / elapsed,
+        p50_ms=p50 * 1000,
+        p95_ms=p95 * 1000,
+    )
+
+
+def _positive_int(value: str) -> int:
+    try:
+        number = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"{value!r} is not an integer") from None
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"{value} must be at least 1")
+    return number
+
+
+def _int_list(value: str) -> list[int]:
+    return [_positive_int(item) for item in value.split(",")]
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "--cloud-sql-max-connections",
+        type=_positive_int,
+        required=True,
+        help="Cloud SQL max_connections for the whole database",
+    )
+    parser.add_argument(
+        "--max-instances",
+        type=_positive_int,
+        default=5,
+        help="Cloud Run --max-instances (default: 5)",
+    )
+    parser.add_argument(
+        "--reserved",
+        type=int,
+        default=3,
+        help="Connections kept free for admin and superuser access (default: 3)",
+    )
+    parser.add_argument(
+        "--cpus",
+        type=_positive_int,
+        default=1,
+        help="Cloud Run --cpu; gunicorn is pinned to this many CPUs (default: 1)",
+    )
+    parser.add_argument("--workers", type=_int_list, default=[1, 2, 4])
+    parser.add_argument("--threads", type=_int_list, default=[1, 2, 4, 8, 16])
+    parser.add_argument("--requests", type=_positive_int, default=500)
+    parser.add_argument("--concurrency", type=_positive_int, default=32)
+    args = parser.parse_args(argv)
+
+    budget = connection_budget(
+        args.cloud_sql_max_connections, args.max_instances, args.reserved
+    )
+    candidates = candidate_settings(args.workers, args.threads, budget)
+    if not candidates:
+        print(f"No setting fits within {budget} connections per instance")
+        return 1
+
+    server_cpus = None
+    if hasattr(os, "sched_setaffinity"):
+        server_cpus, client_cpus = split_cpus(
+            sorted(os.sched_getaffinity(0)), args.cpus
+        )
+        # Keep the load generator off the server's CPUs where possible
+        os.sched_setaffinity(0, client_cpus)
+        if client_cpus == server_cpus:
+            print(
+                "Warning: no spare CPUs, so the load generator shares gunicorn's "
+                f"{len(server_cpus)} CPU(s) and results will understate throughput"
+            )
+    else:
+        print(
+            "Warning: CPU pinning is not supported on this platform, so results "
+            f"reflect all {os.cpu_count()} host CPUs, not {args.cpus}"
+        )
+
+    print(f"Connection budget per instance: {budget}")
+    print(
+        f"{'workers':>7} {'threads':>7} {'conns':>5} {'req/s':>8} "
+        f"{'p50 ms':>8} {'p95 ms':>8} {'errors':>6}"
+    )
+    results = []
+    for workers, threads in candidates:
+        try:
+            result = benchmark_setting(
+                workers, threads, args.requests, args.concurrency, server_cpus
+            )
+        except RuntimeError as e:
+            print(f"{workers:>7} {threads:>7} failed to start: {e}")
+            continue
+        results.append(result)
+        print(
+            f"{result.workers:>7} {result.threads:>7} {result.connections:>5} "
+            f"{result.throughput:>8.1f} {result.p50_ms:>8.1f} "
+            f"{result.p95_ms:>8.1f} {result.errors:>6}"
+        )
+
+    best = recommend(results)
+    if best is None:
+        print(
+            "No setting ran without errors - check the output above and "
+            "that the local database is running"
+        )
+        return 1
+
+    print()
+    print("Recommended settings for each Cloud Run instance:")
+    print("  SERVE_PROFILE=gthread")
+    print(f"  WEB_CONCURRENCY={best.workers}")
+    print(f"  GUNICORN_THREADS={best.threads}")
+    print(f"  DB_MAX_CONNECTIONS={budget}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
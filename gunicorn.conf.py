@@ -0,0 +1,52 @@
+# Gunicorn configuration, selected with SERVE_PROFILE (see serving.py).
+# Based on:
+# - https://docs.gunicorn.org/en/stable/settings.html
+# - https://cloud.google.com/run/docs/tips/python
+
+import os
+
+from dotenv import load_dotenv
+
+# Nothing from the app package is imported here: the gevent profile must
+# monkey-patch before flask, psycopg2 and the pool's locks are loaded
+from serving import Profile, load_serving_config, make_psycopg_green
+
+load_dotenv()  # Serving settings can come from .env, like the app's own
+
+serving = load_serving_config()
+
+# Bind to $PORT (Cloud Run sets this, default to 8080)
+bind = f":{os.environ.get('PORT', '8080')}"
+
+worker_class = serving.worker_class
+workers = serving.workers
+threads = serving.threads
+worker_connections = serving.worker_connections
+
+# Safe to preload: the app opens no database connections until a request,
+# and every worker resets its pool below
+preload_app = serving.preload_app
+
+# Cloud Run manages request timeouts
+timeout = 0
+
+accesslog = "-"
+errorlog = "-"
+
+
+def post_worker_init(worker) -> None:
+    """Give each forked worker its own, empty connection pool"""
+    # Runs after the gevent worker has monkey-patched, before any request
+    if serving.profile == Profile.GEVENT:
+        make_psycopg_green()
+
+    from app.database import reset_pool
+
+    reset_pool(serving.pool_size)
+    worker.log.info(
+        "Serving profile %s: %d workers, %d threads, pool of %d connections",
+        serving.profile.value,
+        serving.workers,
+        serving.threads,
+        serving.pool_size,
+    )
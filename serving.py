@@ -0,0 +1,132 @@
+"""
+Gunicorn serving profiles, read by gunicorn.conf.py.
+
+Kept outside the app package so loading the config doesn't import flask or
+psycopg2 into the master before gevent has monkey-patched.
+"""
+
+import os
+from collections.abc import Mapping
+from enum import Enum
+
+from pydantic import BaseModel, Field
+
+
+class Profile(str, Enum):
+    GTHREAD = "gthread"
+    GEVENT = "gevent"
+    MULTIPROCESS = "multiprocess"
+
+
+# Gunicorn worker class used by each profile
+WORKER_CLASSES = {
+    Profile.GTHREAD: "gthread",
+    Profile.GEVENT: "gevent",
+    Profile.MULTIPROCESS: "sync",
+}
+
+
+# Default multiprocess worker count: 2 x CPUs + 1 for a 1 vCPU Cloud Run
+# instance. Not derived from os.cpu_count(), which reports the host's CPUs
+# inside a container.
+MULTIPROCESS_WORKERS = 3
+
+
+class ServingConfig(BaseModel):
+    profile: Profile
+    worker_class: str
+    workers: int = Field(ge=1)
+    threads: int = Field(ge=1)
+    worker_connections: int = Field(ge=1)
+    pool_size: int = Field(ge=1)
+    preload_app: bool
+
+    @property
+    def total_connections(self) -> int:
+        """Upper bound on database connections opened by one instance"""
+        return self.workers * self.pool_size
+
+
+def _get_int(env: Mapping[str, str], name: str, default: int) -> int:
+    value = env.get(name)
+    if value is None or value == "":
+        return default
+    try:
+        return int(value)
+    except ValueError:
+        raise ValueError(f"{name} must be an integer, got {value!r}") from None
+
+
+def load_serving_config(env: Mapping[str, str] = os.environ) -> ServingConfig:
+    """
+    Build the gunicorn serving configuration from environment variables.
+
+    SERVE_PROFILE selects the worker model:
+    - gthread: few processes, many threads each (default, matches Cloud Run)
+    - gevent: one process of greenlets, psycopg2 made cooperative via psycogreen
+    - multiprocess: sync workers, one request and one connection per process
+
+    WEB_CONCURRENCY, GUNICORN_THREADS, GUNICORN_WORKER_CONNECTIONS and
+    DB_POOL_SIZE override the profile defaults. DB_MAX_CONNECTIONS caps the
+    connections a single instance may open across all of its workers.
+    """
+    try:
+        profile = Profile(env.get("SERVE_PROFILE", Profile.GTHREAD.value))
+    except ValueError:
+        choices = ", ".join(p.value for p in Profile)
+        raise ValueError(
+            f"SERVE_PROFILE must be one of {choices}, got {env['SERVE_PROFILE']!r}"
+        ) from None
+
+    max_connections = _get_int(env, "DB_MAX_CONNECTIONS", 0)
+
+    # Only an explicit WEB_CONCURRENCY can exceed the connection cap
+    default_workers = MULTIPROCESS_WORKERS if profile == Profile.MULTIPROCESS else 1
+    if max_connections:
+        default_workers = min(default_workers, max_connections)
+    workers = _get_int(env, "WEB_CONCURRENCY", default_workers)
+
+    # Only gthread runs threads; the other profiles ignore GUNICORN_THREADS
+    if profile == Profile.GTHREAD:
+        threads = _get_int(env, "GUNICORN_THREADS", 8)
+    else:
+        threads = 1
+
+    worker_connections = _get_int(env, "GUNICORN_WORKER_CONNECTIONS", 100)
+
+    # Each worker owns its pool, sized to the requests it can run at once
+    if profile == Profile.GEVENT:
+        default_pool_size = min(worker_connections, 10)
+    else:
+        default_pool_size = threads
+    pool_size = _get_int(env, "DB_POOL_SIZE", default_pool_size)
+
+    if max_connections:
+        if workers > max_connections:
+            raise ValueError(
+                f"{workers} workers need at least {workers} database connections, "
+                f"but DB_MAX_CONNECTIONS is {max_connections}"
+            )
+        pool_size = min(pool_size, max_connections // workers)
+
+    return ServingConfig(
+        profile=profile,
+        worker_class=WORKER_CLASSES[profile],
+        workers=workers,
+        threads=threads,
+        worker_connections=worker_connections,
+        pool_size=pool_size,
+        # Gevent patches in each worker, so the app must be loaded after that
+        preload_app=profile != Profile.GEVENT,
+    )
+
+
+def make_psycopg_green() -> None:
+    """Make psycopg2 yield to other greenlets while waiting on the database"""
+    try:
+        from psycogreen.gevent import patch_psycopg
+    except ImportError:
+        raise RuntimeError(
+            "The gevent profile requires the 'gevent' extra: uv sync --extra gevent"
+        ) from None
+    patch_psycopg()
@@ -3,12 +3,22 @@ Unit tests for database operations.
 Tests database functions with mocked psycopg2 connections.
 """
 
+import time
 from typing import Any
 
+import psycopg2
 import pytest
 from pytest_mock import MockerFixture
 
-from app.database import DB_CONFIG, get_db_connection, insert_user
+from app import database
+from app.database import (
+    DB_CONFIG,
+    ConnectionPool,
+    get_db_connection,
+    get_pool,
+    insert_user,
+    reset_pool,
+)
 
 
 @pytest.fixture
@@ -24,7 +34,9 @@ def mock_db_connection(mocker: MockerFixture) -> tuple[Any, Any]:
     mock_cursor.__exit__.return_value = None
 
     mock_conn.cursor.return_value = mock_cursor
+    mock_conn.closed = 0
     mocker.patch("app.database.get_db_connection", return_value=mock_conn)
+    reset_pool()
 
     return mock_conn, mock_cursor
 
@@ -92,3 +104,137 @@ class TestInsertUser:
         assert "%s" in sql
         assert malicious_input in params
         assert "DROP TABLE" not in sql
+
+
+class TestConnectionPool:
+    """Test the per-process connection pool"""
+
+    def test_connection_is_reused(self, mocker: MockerFixture) -> None:
+        """Test that a returned connection is handed out again"""
+        mock_connect = mocker.patch("app.database.get_db_connection")
+        mock_connect.return_value.closed = 0
+        pool = ConnectionPool(size=2)
+
+        with pool.connection() as first:
+            pass
+        with pool.connection() as second:
+            pass
+
+        mock_connect.assert_called_once()
+        assert first is second
+
+    def test_connection_discarded_after_error(self, mocker: MockerFixture) -> None:
+        """Test that a connection is closed and not reused after an exception"""
+        mock_connect = mocker.patch("app.database.get_db_connection")
+        mock_connect.return_value.closed = 0
+        pool = ConnectionPool(size=1)
+
+        with pytest.raises(RuntimeError), pool.connection() as conn:
+            raise RuntimeError("query failed")
+
+        conn.close.assert_called_once()
+        with pool.connection():
+            pass
+        assert mock_connect.call_count == 2
+
+    def test_dropped_connection_replaced(self, mocker: MockerFixture) -> None:
+        """Test that a pooled connection dropped by the server is not handed out"""
+        dead_conn = mocker.MagicMock(closed=0)
+        dead_conn.cursor.return_value.__enter__.return_value.execute.side_effect = (
+            psycopg2.OperationalError("server closed the connection unexpectedly")
+        )
+        new_conn = mocker.MagicMock(closed=0)
+        mocker.patch("app.database.get_db_connection", return_value=new_conn)
+        pool = ConnectionPool(size=1, idle_check=30)
+        pool._idle.append((dead_conn, time.monotonic() - 60))
+
+        with pool.connection() as conn:
+            pass
+
+        dead_conn.close.assert_called_once()
+        assert conn is new_conn
+
+    def test_insert_user_succeeds_after_connection_dropped(
+        self, mock_db_connection: tuple[Any, Any], mocker: MockerFixture
+    ) -> None:
+        """Test that a submission still saves when its pooled connection died"""
+        mock_conn, mock_cursor = mock_db_connection
+        mock_cursor.fetchone.return_value = [1]
+        insert_user("John", "Doe", "john@example.com", "red")
+        get_pool().idle_check = 0
+
+        # Server drops the idle session, so the liveness check fails
+        mock_cursor.execute.side_effect = psycopg2.OperationalError(
+            "server closed the connection unexpectedly"
+        )
+        new_conn = mocker.MagicMock(closed=0)
+        new_cursor = new_conn.cursor.return_value.__enter__.return_value
+        new_conn.__enter__.return_value = new_conn
+        new_cursor.fetchone.return_value = [2]
+        mocker.patch("app.database.get_db_connection", return_value=new_conn)
+
+        user_id = insert_user("Jane", "Doe", "jane@example.com", "blue")
+
+        mock_conn.close.assert_called_once()
+        new_conn.commit.assert_called_once()
+        assert user_id == 2
+
+    def test_recently_used_connection_not_pinged(self, mocker: MockerFixture) -> None:
+        """Test that a connection reused straight away skips the liveness check"""
+        mock_connect = mocker.patch("app.database.get_db_connection")
+        mock_connect.return_value.closed = 0
+        mock_is_alive = mocker.patch("app.database._is_alive")
+        pool = ConnectionPool(size=1, idle_check=30)
+
+        with pool.connection():
+            pass
+        with pool.connection():
+            pass
+
+        mock_is_alive.assert_not_called()
+        mock_connect.assert_called_once()
+
+    def test_idle_connection_pinged(self, mocker: MockerFixture) -> None:
+        """Test that a connection idle past the threshold is checked"""
+        mock_connect = mocker.patch("app.database.get_db_connection")
+        mock_connect.return_value.closed = 0
+        mock_is_alive = mocker.patch("app.database._is_alive", return_value=True)
+        pool = ConnectionPool(size=1, idle_check=0)
+
+        with pool.connection():
+            pass
+        with pool.connection() as conn:
+            pass
+
+        mock_is_alive.assert_called_once_with(conn)
+        mock_connect.assert_called_once()
+
+    def test_exhausted_pool_times_out(self, mocker: MockerFixture) -> None:
+        """Test that borrowing beyond the pool size waits then raises"""
+        mocker.patch("app.database.get_db_connection")
+        pool = ConnectionPool(size=1, timeout=0.01)
+
+        with pool.connection(), pytest.raises(TimeoutError):
+            with pool.connection():
+                pass
+
+    def test_get_pool_replaced_after_fork(self, mocker: MockerFixture) -> None:
+        """Test that a pool inherited from a parent process is not reused"""
+        reset_pool()
+        parent_pool = get_pool()
+        mocker.patch("app.database.os.getpid", return_value=parent_pool.pid + 1)
+
+        child_pool = get_pool()
+
+        assert child_pool is not parent_pool
+        assert parent_pool in database._inherited_pools
+
+    def test_reset_pool_sets_size(self, mocker: MockerFixture) -> None:
+        """Test that reset_pool builds the next pool with the given size"""
+        mocker.patch("app.database._pool_size", 8)
+        pool = get_pool()
+
+        reset_pool(size=3)
+
+        assert get_pool() is not pool
+        assert get_pool().size == 3
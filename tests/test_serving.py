@@ -0,0 +1,107 @@
+"""
+Unit tests for gunicorn serving profiles.
+Tests how environment variables resolve to worker and pool settings.
+"""
+
+import pytest
+
+from serving import Profile, load_serving_config
+
+
+class TestServingProfiles:
+    """Test the defaults for each serving profile"""
+
+    def test_default_profile_is_gthread(self) -> None:
+        """Test that no settings gives one worker with eight threads"""
+        config = load_serving_config({})
+
+        assert config.profile == Profile.GTHREAD
+        assert config.worker_class == "gthread"
+        assert config.workers == 1
+        assert config.threads == 8
+        assert config.pool_size == 8
+        assert config.preload_app is True
+
+    def test_gevent_profile(self) -> None:
+        """Test that gevent uses a bounded pool and does not preload"""
+        config = load_serving_config({"SERVE_PROFILE": "gevent"})
+
+        assert config.worker_class == "gevent"
+        assert config.threads == 1
+        assert config.pool_size == 10
+        assert config.preload_app is False
+
+    def test_gevent_ignores_threads_setting(self) -> None:
+        """Test that a stray GUNICORN_THREADS doesn't stop gevent booting"""
+        config = load_serving_config(
+            {"SERVE_PROFILE": "gevent", "GUNICORN_THREADS": "many"}
+        )
+
+        assert config.threads == 1
+
+    def test_multiprocess_default_workers(self) -> None:
+        """Test that multiprocess defaults to a fixed, small worker count"""
+        config = load_serving_config({"SERVE_PROFILE": "multiprocess"})
+
+        assert config.workers == 3
+        assert config.total_connections == 3
+
+    def test_multiprocess_default_clamped_to_max_connections(self) -> None:
+        """Test that default workers shrink to fit DB_MAX_CONNECTIONS"""
+        config = load_serving_config(
+            {"SERVE_PROFILE": "multiprocess", "DB_MAX_CONNECTIONS": "2"}
+        )
+
+        assert config.workers == 2
+        assert config.total_connections == 2
+
+    def test_multiprocess_profile(self) -> None:
+        """Test that multiprocess uses sync workers with one connection each"""
+        config = load_serving_config(
+            {"SERVE_PROFILE": "multiprocess", "WEB_CONCURRENCY": "3"}
+        )
+
+        assert config.worker_class == "sync"
+        assert config.workers == 3
+        assert config.threads == 1
+        assert config.total_connections == 3
+
+
+class TestServingOverrides:
+    """Test environment variable overrides and validation"""
+
+    def test_overrides_applied(self) -> None:
+        """Test that explicit settings replace profile defaults"""
+        config = load_serving_config(
+            {"WEB_CONCURRENCY": "2", "GUNICORN_THREADS": "4", "DB_POOL_SIZE": "2"}
+        )
+
+        assert config.workers == 2
+        assert config.threads == 4
+        assert config.pool_size == 2
+
+    def test_max_connections_caps_pool(self) -> None:
+        """Test that pools are shrunk to fit DB_MAX_CONNECTIONS"""
+        config = load_serving_config(
+            {"WEB_CONCURRENCY": "2", "GUNICORN_THREADS": "8", "DB_MAX_CONNECTIONS": "5"}
+        )
+
+        assert config.pool_size == 2
+        assert config.total_connections <= 5
+
+    def test_max_connections_below_workers_rejected(self) -> None:
+        """Test that more workers than connections is an error"""
+        with pytest.raises(ValueError, match="DB_MAX_CONNECTIONS"):
+            load_serving_config({"WEB_CONCURRENCY": "4", "DB_MAX_CONNECTIONS": "2"})
+
+    @pytest.mark.parametrize(
+        "env,match",
+        [
+            ({"SERVE_PROFILE": "eventlet"}, "SERVE_PROFILE"),
+            ({"GUNICORN_THREADS": "many"}, "GUNICORN_THREADS"),
+        ],
+    )
+    def test_invalid_settings_rejected(self, env: dict[str, str], match: str) -> None:
+        """Test that unknown profiles and non-integer values are rejected"""
+        with pytest.raises(ValueError, match=match):
+            load_serving_config(env)
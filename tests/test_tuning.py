@@ -0,0 +1,144 @@
+"""
+Unit tests for the serving autotuner.
+Tests the connection budget and recommendation logic without running gunicorn.
+"""
+
+import pytest
+from pytest_mock import MockerFixture
+
+from app.tuning import (
+    BenchmarkResult,
+    _wait_until_ready,
+    candidate_settings,
+    connection_budget,
+    main,
+    recommend,
+    split_cpus,
+)
+
+
+def make_result(
+    workers: int, threads: int, throughput: float, errors: int = 0
+) -> BenchmarkResult:
+    return BenchmarkResult(
+        workers=workers,
+        threads=threads,
+        connections=workers * threads,
+        requests=100,
+        errors=errors,
+        throughput=throughput,
+        p50_ms=10.0,
+        p95_ms=20.0,
+    )
+
+
+class TestConnectionBudget:
+    """Test splitting the Cloud SQL limit across instances"""
+
+    def test_budget_split_across_instances(self) -> None:
+        """Test that reserved connections are removed before dividing"""
+        assert connection_budget(25, 5, reserved=3) == 4
+
+    def test_budget_never_negative(self) -> None:
+        """Test that a limit below the reserve gives no budget"""
+        assert connection_budget(2, 5, reserved=3) == 0
+
+    def test_candidates_fit_budget(self) -> None:
+        """Test that only settings within the budget are swept"""
+        candidates = candidate_settings([1, 2], [1, 2, 4], budget=4)
+
+        assert candidates == [(1, 1), (1, 2), (1, 4), (2, 1), (2, 2)]
+
+
+class TestSplitCpus:
+    """Test dividing host CPUs between gunicorn and the load generator"""
+
+    def test_server_gets_cloud_run_cpus(self) -> None:
+        """Test that the server is limited to the requested CPU count"""
+        assert split_cpus([0, 1, 2, 3], cpus=1) == ({0}, {1, 2, 3})
+
+    def test_client_shares_when_no_spare_cpus(self) -> None:
+        """Test that the client falls back to the server's CPUs"""
+        assert split_cpus([0], cpus=1) == ({0}, {0})
+
+
+class TestRecommend:
+    """Test choosing the recommended setting"""
+
+    def test_recommends_highest_throughput(self) -> None:
+        """Test that the fastest error-free setting is chosen"""
+        results = [make_result(1, 4, 80.0), make_result(2, 2, 120.0)]
+
+        assert recommend(results) == results[1]
+
+    def test_ignores_settings_with_errors(self) -> None:
+        """Test that settings producing errors are never recommended"""
+        results = [make_result(1, 4, 80.0), make_result(2, 2, 120.0, errors=3)]
+
+        assert recommend(results) == results[0]
+
+    def test_prefers_fewer_connections_on_tie(self) -> None:
+        """Test that equal throughput favours the smaller footprint"""
+        results = [make_result(2, 2, 100.0), make_result(1, 2, 100.0)]
+
+        assert recommend(results) == results[1]
+
+    def test_no_recommendation_when_all_fail(self) -> None:
+        """Test that None is returned when every setting errored"""
+        assert recommend([make_result(1, 1, 0.0, errors=100)]) is None
+
+
+class TestArguments:
+    """Test command line validation"""
+
+    @pytest.mark.parametrize(
+        "option,value",
+        [
+            ("--max-instances", "0"),
+            ("--requests", "-5"),
+            ("--concurrency", "0"),
+            ("--cpus", "two"),
+            ("--workers", "1,0"),
+        ],
+    )
+    def test_non_positive_values_rejected(self, option: str, value: str) -> None:
+        """Test that zero, negative and non-integer values are usage errors"""
+        with pytest.raises(SystemExit) as exc_info:
+            main(["--cloud-sql-max-connections", "25", option, value])
+
+        assert exc_info.value.code == 2
+
+
+class TestStartupFailures:
+    """Test how the sweep handles a server that fails to boot"""
+
+    def test_wait_stops_when_server_exits(self, mocker: MockerFixture) -> None:
+        """Test that an exited gunicorn is reported without waiting for timeout"""
+        server = mocker.MagicMock(returncode=1)
+        server.poll.return_value = 1
+
+        with pytest.raises(RuntimeError, match="exited with code 1"):
+            _wait_until_ready("http://127.0.0.1:1", server, timeout=30)
+
+    def test_sweep_continues_after_failed_setting(
+        self, mocker: MockerFixture, capsys: pytest.CaptureFixture[str]
+    ) -> None:
+        """Test that one setting failing to start doesn't abort the sweep"""
+        mocker.patch("app.tuning.os.sched_setaffinity", create=True)
+        mocker.patch(
+            "app.tuning.benchmark_setting",
+            side_effect=[
+                RuntimeError("gunicorn exited with code 1\nboot error"),
+                make_result(1, 2, 50.0),
+            ],
+        )
+
+        exit_code = main(
+            ["--cloud-sql-max-connections", "13", "--workers", "1", "--threads", "1,2"]
+        )
+
+        output = capsys.readouterr().out
+        assert exit_code == 0
+        assert "failed to start: gunicorn exited with code 1" in output
+        assert "boot error" in output
+        assert "GUNICORN_THREADS=2" in output